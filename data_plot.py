@@ -1,37 +1,44 @@
 import data_util
 import matplotlib.pyplot as plt
+import numpy as np
+
+
+plot_points = 2000      # Points drawn per line, after downsampling
+
+"""
+Plot series (N or NxM) against ts, downsampled to keep large captures quick to draw.
+Columns share the kept points of every column, so all are drawn by a single plot call.
+Returns list of lines, one per column.
+"""
+def plot_downsampled(ax, ts, series):
+    if len(ts) <= plot_points:          # Nothing to drop, including empty recordings
+        return ax.plot(ts, series)
+    columns = series.reshape(len(ts), -1).T
+    idx = np.unique(np.concatenate([data_util.lttb_indices(ts, c, plot_points) for c in columns]))
+    return ax.plot(ts[idx], series[idx])
 
 
 if __name__ == "__main__":
     data = data_util.read_data("data/BINARY_DATA.dat")
     ts = data["timestamp"]
     fig, ax = plt.subplots(4, 1)
-    la, = ax[0].plot(ts, data["analog"])
+    la, = plot_downsampled(ax[0], ts, data["analog"])
     la.set_label("voltage")
     ax[0].set_title("Analog input (V)")
     ax[0].legend()
-    lb0, = ax[1].plot(ts, data["btn_0"])
-    lb1, = ax[1].plot(ts, data["btn_1"])
+    lb0, = plot_downsampled(ax[1], ts, data["btn_0"])
+    lb1, = plot_downsampled(ax[1], ts, data["btn_1"])
     lb0.set_label("Button 0")
     lb1.set_label("Button 1")
     ax[1].set_title("Buttons")
     ax[1].legend()
-    lax, = ax[2].plot(ts, data["acc"][:,0])
-    lay, = ax[2].plot(ts, data["acc"][:,1])
-    laz, = ax[2].plot(ts, data["acc"][:,2])
-    lax.set_label("x")
-    lay.set_label("y")
-    laz.set_label("z")
+    for line, label in zip(plot_downsampled(ax[2], ts, data["acc"]), ("x", "y", "z")):
+        line.set_label(label)
     ax[2].set_title("Accelerometer (m/s²)")
     ax[2].legend()
-    lgx, = ax[3].plot(ts, data["gyro"][:,0])
-    lgy, = ax[3].plot(ts, data["gyro"][:,1])
-    lgz, = ax[3].plot(ts, data["gyro"][:,2])
-    lgx.set_label("x")
-    lgy.set_label("y")
-    lgz.set_label("z")
+    for line, label in zip(plot_downsampled(ax[3], ts, data["gyro"]), ("x", "y", "z")):
+        line.set_label(label)
     ax[3].set_title("Gyro (rad/s)")
     ax[3].legend()
     plt.tight_layout(pad=1.0)
     plt.show()
-
@@ -2,13 +2,35 @@ from math import pi
 import struct
 import numpy as np
 import os
+import mmap
+import contextlib
+try:
+    import pandas as pd                 # Optional, faster csv parsing
+except ImportError:
+    pd = None
+try:
+    from numba import njit, prange      # Optional, compiled single-pass .dat decoding
+except ImportError:
+    njit = None
 
 
 csv_header = "timestamp,analog,btn_0,btn_1,acc_x,acc_y,acc_z,gyro_x,gyro_y,gyro_z"
+# Per-column formats; timestamps are exact to the microsecond, sensor values well below 1 LSB
+csv_format = ["%.6f", "%.6f", "%d", "%d"] + ["%.9g"] * 6
 
 # little-endian, u32 microseconds, u16 analog, 2 u8 buttons, 3 i16 accelerometer, 3 i16 gyro
 data_length_bytes = 4 + 2 + 1 + 1 + 3*2 + 3*2
 data_format       = "<LHBBhhhhhh"
+data_struct       = struct.Struct(data_format)      # Precompiled, avoids re-parsing format per element
+# Equivalent numpy structured dtype, for parsing many data elements at once
+data_dtype        = np.dtype([
+    ("micros", "<u4"),
+    ("analog", "<u2"),
+    ("b0",     "u1"),
+    ("b1",     "u1"),
+    ("acc",    "<i2", 3),
+    ("gyro",   "<i2", 3),
+])
 
 # Constants for conversion to SI units
 micros_to_s       = 1.0e-6                          # microseconds to seconds 
@@ -17,11 +39,15 @@ acc_to_mps2       = 2.0 * 9.81 / 32768.0            # 16-bit signed integer to m
 gyro_to_radps     = 250.0 * pi / 180.0 / 32768.0    # 16-bit signed integer to rad/s
 # For more information on data format, read Arduino sketch
 
+# Array dtype for sensor values from read_data. float32 holds well over the sensors' 16-bit resolution
+# at half the memory of float64. Timestamps stay float64: float32 only resolves ~60us after 1000s.
+value_dtype = np.float32
+
 """
-Convert data bytes to tuple of SI unit values
+Convert raw unpacked integers to tuple of SI unit values
 """
-def bytes_to_values(b):
-    (micros, analog, b0, b1, ax, ay, az, gx, gy, gz) = struct.unpack(data_format, b)
+def _raw_to_values(raw):
+    (micros, analog, b0, b1, ax, ay, az, gx, gy, gz) = raw
     return (
         micros * micros_to_s,
         analog * analog_to_voltage,
@@ -35,6 +61,56 @@ def bytes_to_values(b):
         gz * gyro_to_radps,
     )
 
+"""
+Convert data bytes to tuple of SI unit values
+"""
+def bytes_to_values(b):
+    return _raw_to_values(data_struct.unpack(b))
+
+"""
+Convert data element at offset within a larger buffer to tuple of SI unit values, without copying it out
+"""
+def bytes_to_values_from(buf, offset=0):
+    return _raw_to_values(data_struct.unpack_from(buf, offset))
+
+"""
+View data bytes of count elements (default all) from offset as numpy structured array of raw values.
+Fields are named as in data_dtype; no conversion to SI units is done.
+"""
+def bytes_to_values_bulk(buf, offset=0, count=-1):
+    return np.frombuffer(buf, dtype=data_dtype, count=count, offset=offset)
+
+"""
+Map open binary file f read-only, so it is paged in on demand rather than copied into memory.
+Arrays viewing the map must not outlive it.
+"""
+def _map_file(f):
+    if os.fstat(f.fileno()).st_size == 0:       # Empty files can't be mapped
+        return contextlib.nullcontext(b"")
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+"""
+Number of whole data elements in buf, warning about any trailing partial element
+"""
+def _count_elements(buf, name):
+    count, remainder = divmod(len(buf), data_length_bytes)
+    if remainder:
+        print(f"WARNING: '{name}' has {remainder} trailing bytes after {count} elements; ignoring them")
+    return count
+
+"""
+Convert structured array of raw values to Nx10 ndarray of SI unit values, columns ordered as csv_header
+"""
+def bulk_to_values(rec):
+    values = np.empty((rec.size, 10))
+    values[:,0] = rec["micros"] * micros_to_s
+    values[:,1] = rec["analog"] * analog_to_voltage
+    values[:,2] = rec["b0"]
+    values[:,3] = rec["b1"]
+    values[:,4:7] = rec["acc"] * acc_to_mps2
+    values[:,7:10] = rec["gyro"] * gyro_to_radps
+    return values
+
 """
 Convert tuple of values to csv row
 """
@@ -44,8 +120,9 @@ def values_to_csv(values):
 """
 Convert tuple of values to formatted string
 """
+_values_str_format = "[{:8.4f}] a:{:4.2f}, b0:{:1.0f}, b1:{:1.0f}, acc:{:7.3f},{:7.3f},{:7.3f}, gyro:{:7.3f},{:7.3f},{:7.3f}".format
 def values_to_str(values):
-    return f"[{values[0]:8.4f}] a:{values[1]:4.2f}, b0:{values[2]:1.0f}, b1:{values[3]:1.0f}, acc:{values[4]:7.3f},{values[5]:7.3f},{values[6]:7.3f}, gyro:{values[7]:7.3f},{values[8]:7.3f},{values[9]:7.3f}"
+    return _values_str_format(*values)
 
 """
 Convert filename.dat (binary) to filename.csv (text)
@@ -53,18 +130,97 @@ Convert filename.dat (binary) to filename.csv (text)
 def dat_to_csv(filename):
     filename_dat = f"{filename}.dat"
     filename_csv = f"{filename}.csv"
-    with open(filename_dat, "rb") as dat:
-        data = dat.read()
-        data_element_count = int(len(data) / data_length_bytes)
-        with open(filename_csv, "wt") as csv:
-            csv.write(f"{csv_header}\n")
-            for i in range(data_element_count):
-                j1 = i * data_length_bytes
-                j2 = j1 + data_length_bytes
-                values = bytes_to_values(data[j1:j2])
-                csv.write(f"{values_to_csv(values)}\n")
-"""
-Convert file.dat or file.csv to dictionary of numpy ndarrays
+    with open(filename_dat, "rb") as dat, _map_file(dat) as data:
+        data_element_count = _count_elements(data, filename_dat)
+        values = bulk_to_values(bytes_to_values_bulk(data, count=data_element_count))
+        np.savetxt(filename_csv, values, fmt=csv_format, delimiter=',', header=csv_header, comments='')
+
+"""
+Indices of n_out points of series y(x), chosen by Largest-Triangle-Three-Buckets downsampling.
+Keeps the visual shape of a line plot; first and last points are always kept.
+"""
+def lttb_indices(x, y, n_out):
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # Bucket boundaries for points between first and last, one bucket per output point
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    idx = np.empty(n_out, dtype=np.intp)
+    idx[0] = 0
+    idx[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Third triangle vertex is the average of next bucket, or the last point
+        if i < n_out - 3:
+            c_x = x[hi:edges[i + 2]].mean()
+            c_y = y[hi:edges[i + 2]].mean()
+        else:
+            c_x = x[-1]
+            c_y = y[-1]
+        # Keep the point in this bucket forming the largest triangle with previous kept point
+        area = np.abs((x[a] - c_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (c_y - y[a]))
+        a = lo + np.argmax(area)
+        idx[i + 1] = a
+    return idx
+
+if njit is not None:
+    """
+    Little-endian 16-bit signed integer from two bytes
+    """
+    @njit(cache=True, inline="always")
+    def _i16(buf, o):
+        v = np.int32(buf[o]) | (np.int32(buf[o + 1]) << 8)
+        return v - 65536 if v >= 32768 else v
+
+    """
+    Decode elements of uint8 buffer into preallocated SI unit arrays, in one compiled pass
+    """
+    @njit(cache=True, fastmath=True, parallel=True)
+    def _decode_elements(buf, ts, vs, b0s, b1s, accs, gyros):
+        for i in prange(ts.shape[0]):
+            o = i * data_length_bytes
+            micros = np.uint32(buf[o]) | (np.uint32(buf[o + 1]) << 8) | (np.uint32(buf[o + 2]) << 16) | (np.uint32(buf[o + 3]) << 24)
+            ts[i] = micros * micros_to_s
+            vs[i] = (np.int32(buf[o + 4]) | (np.int32(buf[o + 5]) << 8)) * analog_to_voltage
+            b0s[i] = buf[o + 6]
+            b1s[i] = buf[o + 7]
+            for k in range(3):
+                accs[i, k] = _i16(buf, o + 8 + 2*k) * acc_to_mps2
+                gyros[i, k] = _i16(buf, o + 14 + 2*k) * gyro_to_radps
+else:
+    _decode_elements = None
+
+"""
+Convert count data elements in buf to dictionary of numpy ndarrays, as described for read_data
+"""
+def _bytes_to_data(buf, count):
+    if _decode_elements is not None:
+        data = {
+            "timestamp": np.empty(count),
+            "analog":    np.empty(count, dtype=value_dtype),
+            "btn_0":     np.empty(count, dtype=value_dtype),
+            "btn_1":     np.empty(count, dtype=value_dtype),
+            "acc":       np.empty((count, 3), dtype=value_dtype),
+            "gyro":      np.empty((count, 3), dtype=value_dtype),
+        }
+        _decode_elements(np.frombuffer(buf, dtype=np.uint8, count=count * data_length_bytes),
+                         data["timestamp"], data["analog"], data["btn_0"], data["btn_1"], data["acc"], data["gyro"])
+        return data
+    rec = bytes_to_values_bulk(buf, count=count)
+    # Convert in float64 then round once, as the compiled path does, so both give identical values
+    return {
+        "timestamp": rec["micros"] * micros_to_s,
+        "analog":    (rec["analog"] * analog_to_voltage).astype(value_dtype),
+        "btn_0":     rec["b0"].astype(value_dtype),
+        "btn_1":     rec["b1"].astype(value_dtype),
+        "acc":       (rec["acc"] * acc_to_mps2).astype(value_dtype),
+        "gyro":      (rec["gyro"] * gyro_to_radps).astype(value_dtype),
+    }
+
+"""
+Convert file.dat or file.csv to dictionary of numpy ndarrays.
+Timestamps are float64, other entries value_dtype (float32).
     Entry         Dimensions    Units
     "timestamp"   Nx1           s
     "analog"      Nx1           V
@@ -77,41 +233,20 @@ def read_data(filepath):
     data = {}
     name, extension = os.path.splitext(filepath)
     if extension == ".dat":
-        with open(filepath, "rb") as f:
-            data_bin = f.read()
-            data_element_count = int(len(data_bin) / data_length_bytes)
-            ts = np.ndarray((data_element_count,))
-            vs = np.ndarray((data_element_count,))
-            b0s = np.ndarray((data_element_count,))
-            b1s = np.ndarray((data_element_count,))
-            accs = np.ndarray((data_element_count,3))
-            gyros = np.ndarray((data_element_count,3))
-            for i in range(data_element_count):
-                j1 = i * data_length_bytes
-                j2 = j1 + data_length_bytes
-                vals = bytes_to_values(data_bin[j1:j2])
-                ts[i] = vals[0]
-                vs[i] = vals[1]
-                b0s[i] = vals[2]
-                b1s[i] = vals[3]
-                accs[i,:] = vals[4:7]
-                gyros[i,:] = vals[7:10]
-            data["timestamp"] = ts
-            data["analog"] = vs
-            data["btn_0"] = b0s
-            data["btn_1"] = b1s
-            data["acc"] = accs
-            data["gyro"] = gyros
+        with open(filepath, "rb") as f, _map_file(f) as data_bin:
+            data_element_count = _count_elements(data_bin, filepath)
+            # Parse all elements at once, ignoring any trailing partial element
+            data = _bytes_to_data(data_bin, data_element_count)
     elif extension == ".csv":
-        with open(filepath, "rt") as f:
-            f.readline()                    # ignore header
-            lines = f.readlines()
-            csv_data = np.loadtxt(lines, delimiter=',')
-            data["timestamp"] = csv_data[:,0]
-            data["analog"] = csv_data[:,1]
-            data["btn_0"] = csv_data[:,2]
-            data["btn_1"] = csv_data[:,3]
-            data["acc"] = csv_data[:,4:7]
-            data["gyro"] = csv_data[:,7:10]
+        if pd is not None:
+            csv_data = pd.read_csv(filepath, dtype=np.float64, engine="c").to_numpy()
+        else:
+            csv_data = np.loadtxt(filepath, delimiter=',', skiprows=1, ndmin=2)   # skip header
+        data["timestamp"] = csv_data[:,0]
+        data["analog"] = csv_data[:,1].astype(value_dtype)
+        data["btn_0"] = csv_data[:,2].astype(value_dtype)
+        data["btn_1"] = csv_data[:,3].astype(value_dtype)
+        data["acc"] = csv_data[:,4:7].astype(value_dtype)
+        data["gyro"] = csv_data[:,7:10].astype(value_dtype)
     return data
 
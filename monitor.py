@@ -16,6 +16,13 @@ import data_util
 import time
 import pathlib
 import os
+import mmap
+import atexit
+# File writing
+try:
+    import liburing                     # Optional, Linux io_uring file writes
+except ImportError:
+    liburing = None
 
 
 byte_message      = 0
@@ -26,6 +33,140 @@ byte_heartbeat    = 250
 byte_error        = 255
 
 connection_status_warning_time = 2
+serial_read_timeout            = 0.01   # Seconds; bounds delay of queued commands and disconnect
+console_display_interval       = 0.05   # Minimum seconds between data lines printed to console
+console_max_lines              = 2000   # Older console lines are discarded
+console_queue_max              = 200    # Data lines are skipped while this many messages await display
+console_drain_max              = 1024   # Maximum messages added to console per UI refresh
+file_buffer_size               = 1 << 16  # Bytes per write to .dat files, a multiple of page size
+elem_buf_count                 = 1024   # Initial capacity, in data elements, of received batch buffer
+uring_depth                    = 8      # Maximum file writes in flight when using io_uring
+mmap_initial_size              = 1 << 24    # Bytes of file first mapped when using mmap, doubled as needed
+# Write .dat files through io_uring when DATA_LOGGER_IO_URING=1 and liburing is installed
+use_io_uring = liburing is not None and os.environ.get("DATA_LOGGER_IO_URING") == "1"
+# Otherwise write .dat files through a memory map when DATA_LOGGER_MMAP=1
+use_mmap = os.environ.get("DATA_LOGGER_MMAP") == "1"
+
+# Encoded form of previously sent commands, bounded as file commands vary
+command_cache     = {}
+command_cache_max = 64
+
+
+"""
+Asynchronous file writes through Linux io_uring.
+Buffers are written in order at increasing file offsets, with up to depth writes in flight,
+so the caller can keep filling the next buffer while the previous ones reach disk.
+"""
+class UringFileWriter:
+    def __init__(self, fd, buffer_size, depth=uring_depth):
+        self.fd = fd
+        self.depth = depth
+        self.offset = 0                 # File offset of next write
+        self.ring = liburing.Ring()
+        self.cqe = liburing.Cqe()
+        liburing.io_uring_queue_init(depth, self.ring)
+        # Empty buffers handed out by swap
+        self.free = [bytearray(buffer_size) for _ in range(depth)]
+        # Submitted writes by id: (buffer to free on completion or None, data, file offset)
+        self.in_flight = {}
+        self.next_id = 0
+    
+    """
+    Exchange buffer b, of which the first n bytes are to be written, for an empty buffer.
+    b must not be modified until it is handed out again.
+    """
+    def swap(self, b, n):
+        self._submit(b if n == len(b) else bytes(b[:n]), b, self.offset)
+        self.offset += n
+        while not self.free:
+            self._reap()
+        return self.free.pop()
+    
+    """
+    Write bytes object b, after all previously submitted data.
+    """
+    def write(self, b):
+        self._submit(b, None, self.offset)
+        self.offset += len(b)
+    
+    """
+    Wait for all writes to complete, then release the ring.
+    """
+    def close(self):
+        try:
+            while self.in_flight:
+                self._reap()
+        finally:
+            liburing.io_uring_queue_exit(self.ring)
+    
+    # Queue write of data at offset and submit it, waiting first if too many writes are in flight
+    def _submit(self, data, owner, offset):
+        while len(self.in_flight) >= self.depth:
+            self._reap()
+        sqe = liburing.io_uring_get_sqe(self.ring)
+        liburing.io_uring_prep_write(sqe, self.fd, data, offset)
+        liburing.io_uring_sqe_set_data64(sqe, self.next_id)
+        self.in_flight[self.next_id] = (owner, data, offset)
+        self.next_id += 1
+        liburing.io_uring_submit(self.ring)
+    
+    # Wait for a write to complete, and handle its completion
+    def _reap(self):
+        liburing.io_uring_wait_cqe(self.ring, self.cqe)
+        cqe = self.cqe[0]
+        write_id, res = cqe.user_data, cqe.res
+        liburing.io_uring_cq_advance(self.ring, 1)
+        owner, data, offset = self.in_flight.pop(write_id)
+        written = liburing.trap_error(res)          # Raises OSError on failure
+        if written < len(data):                     # Short write; write the remainder
+            self._submit(bytes(data[written:]), owner, offset + written)
+        elif owner is not None:
+            self.free.append(owner)
+
+
+"""
+File writes by copying into a memory map of the file, leaving the OS page cache to write to disk.
+File is preallocated and remapped at double size whenever full, then truncated to length on close.
+"""
+class MmapFileWriter:
+    def __init__(self, fd, size=mmap_initial_size):
+        self.fd = fd
+        self.pos = 0                    # File offset of next write
+        self.size = 0
+        self.mm = None
+        self._grow(size)
+    
+    """
+    Write bytes-like b after all previously written data.
+    """
+    def write(self, b):
+        n = len(b)
+        if self.pos + n > self.size:
+            self._grow(max(2 * self.size, self.pos + n))
+        self.mm[self.pos:self.pos + n] = b
+        self.pos += n
+    
+    """
+    Unmap file and cut it to the written length.
+    """
+    def close(self):
+        if self.mm:
+            self.mm.flush()
+            self.mm.close()
+            self.mm = None
+        os.ftruncate(self.fd, self.pos)
+    
+    # Extend file to size bytes and map all of it
+    def _grow(self, size):
+        if self.mm:
+            self.mm.close()
+            self.mm = None
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(self.fd, 0, size)    # Reserve disk blocks now, not on page faults
+        else:
+            os.ftruncate(self.fd, size)
+        self.mm = mmap.mmap(self.fd, size)
+        self.size = size
 
 
 """
@@ -35,52 +176,174 @@ Initialize -> set suffix -> start -> write -> end
                   |__________|_________________|
 """
 class DataStreamDatWriter:
-    def __init__(self):
-        self.f = None
+    """
+    Writer initializer. buffer_size sets bytes of entries held in memory per write to disk.
+    use_io_uring submits those writes asynchronously through UringFileWriter (Linux, liburing).
+    use_mmap instead copies entries straight into a memory map of the file through MmapFileWriter.
+    """
+    def __init__(self, buffer_size=file_buffer_size, use_io_uring=use_io_uring, use_mmap=use_mmap):
+        self.buffer_size = buffer_size
+        self.use_io_uring = use_io_uring and liburing is not None   # Falls back to os.write without liburing
+        self.use_mmap = use_mmap and not self.use_io_uring
+        self.uring = None
+        self.mapped = None
+        self.fd = None
+        self.thr_write = None
         self.fname = ""
         self.suffix = ""
         self.t_start = -1
         self.t_end = -1
         self.count = 0
+        self.write_error = None         # OSError that stopped the writer thread, if any
+        # Writer thread is a daemon so it can't hold the process open, so write out any open file at exit
+        atexit.register(self.end)
     
     def set_file_suffix(self, suffix):
         self.suffix = suffix
     
     """
     Open file "directory/{timestamp}{suffix}.dat".
+    Any file still open is closed first.
     """
     def start(self, directory):
+        self.end()
         timestr = time.strftime("%Y%m%d-%H%M%S")
         self.fname = f"{timestr}{self.suffix}.dat"
         fpath = os.path.join(directory, self.fname)
-        os.makedirs(os.path.dirname(fpath), exist_ok=True)
-        self.f = open(fpath, "wb")
-        self.element_count = 0
+        # Unbuffered file; writer thread does its own buffering, so disk sees few large sequential writes.
+        # Memory maps need read access too.
+        mode = os.O_RDWR if self.use_mmap else os.O_WRONLY
+        flags = mode | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+        try:
+            fd = os.open(fpath, flags, 0o644)
+        except FileNotFoundError:
+            # Create directory only when missing, rather than checking on every recording
+            os.makedirs(os.path.dirname(fpath), exist_ok=True)
+            fd = os.open(fpath, flags, 0o644)
+        # Backends can fail at run time (io_uring blocked by seccomp, no space to preallocate a map),
+        # so fall back to os.write
+        if self.use_io_uring:
+            try:
+                self.uring = UringFileWriter(fd, self.buffer_size)
+            except OSError as e:
+                print(f"WARNING: io_uring unavailable ({e}); writing '{self.fname}' with os.write")
+        elif self.use_mmap:
+            try:
+                self.mapped = MmapFileWriter(fd)
+            except OSError as e:
+                os.ftruncate(fd, 0)             # Drop any partial preallocation
+                print(f"WARNING: memory map unavailable ({e}); writing '{self.fname}' with os.write")
+        # Entries staged by writer thread for the next file write; memory maps need no staging
+        self.buf = None if self.mapped else bytearray(self.buffer_size)
+        self.buf_mv = None if self.mapped else memoryview(self.buf)
+        self.buf_len = 0
+        self.write_error = None
+        # Host clock for average frequency, so entries needn't be decoded
+        self.t_start = time.monotonic()
+        # Separate thread performs file writes
+        self.write_queue = queue.SimpleQueue()
+        self.thr_write = threading.Thread(target=self._write_loop, daemon=True)
+        self.thr_write.start()
+        # File only counts as open once it can be written
+        self.fd = fd
     
     """
     Write a single data entry to file.
+    Entry is queued for the writer thread, so disk stalls don't hold up the caller.
+    Raises the writer thread's OSError once a file write has failed.
     """
     def write(self, b):
-        if self.f:
-            self.f.write(b)
-            # Update timestamp tracker and entry counter
-            t = data_util.bytes_to_values(b)[0]
-            if self.t_start == -1:
-                self.t_start = t
-            self.t_end = t
-            self.count += 1
+        if self.fd is not None:
+            if self.write_error is not None:
+                raise self.write_error
+            self.write_queue.put(bytes(b))
+    
+    """
+    Write a batch of consecutive data entries to file.
+    Entries are queued for the writer thread, so disk stalls don't hold up the caller.
+    Raises the writer thread's OSError once a file write has failed.
+    """
+    def write_many(self, buf):
+        if self.fd is not None and len(buf):
+            if self.write_error is not None:
+                raise self.write_error
+            self.write_queue.put(bytes(buf))
+    
+    # Writer thread function, stages queued entries until end() queues None.
+    # A failed write is recorded for write, write_many and end to report, and stops the thread
+    def _write_loop(self):
+        entry_bytes = data_util.data_length_bytes
+        try:
+            while True:
+                b = self.write_queue.get()
+                if b is None:
+                    break
+                self.count += len(b) // entry_bytes
+                if self.mapped:                 # Map is already in memory, no staging needed
+                    self.mapped.write(b)
+                    continue
+                n = len(b)
+                if self.buf_len + n > self.buffer_size:
+                    self._flush()
+                if n > self.buffer_size:        # Too large to stage
+                    self._write_all(b)
+                else:
+                    self.buf_mv[self.buf_len:self.buf_len + n] = b
+                    self.buf_len += n
+            self._flush()
+        except OSError as e:
+            self.write_error = e
+        self.t_end = time.monotonic()
+    
+    # Write out staged entries
+    def _flush(self):
+        if self.buf_len:
+            if self.uring:
+                # Stage into another buffer while this one is written
+                self.buf_mv.release()
+                self.buf = self.uring.swap(self.buf, self.buf_len)
+                self.buf_mv = memoryview(self.buf)
+            else:
+                self._write_all(self.buf_mv[:self.buf_len])
+            self.buf_len = 0
+    
+    # Write all of bytes object b to file, as os.write may write only part
+    def _write_all(self, b):
+        if self.uring:
+            self.uring.write(b)
+            return
+        mv = memoryview(b)
+        while mv:
+            mv = mv[os.write(self.fd, mv):]
     
     """
     Close the current file.
     """
     def end(self):
-        if self.f:
-            self.f.close()
-            self.f = None
-            # Calculate average frequency
-            time_range = self.t_end - self.t_start
-            f = self.count / time_range
-            print(f"Closed file '{self.fname}', {self.count} entries in {time_range:.2f}s, averaging {f:.0f}Hz")
+        if self.fd is not None and self.thr_write is not None:
+            # Let writer thread write out all queued entries; no fsync, the OS page cache reaches disk on its own
+            self.write_queue.put(None)
+            self.thr_write.join()
+            try:
+                if self.uring:
+                    self.uring.close()
+                if self.mapped:
+                    self.mapped.close()
+            except OSError as e:
+                if self.write_error is None:
+                    self.write_error = e
+            finally:
+                self.uring = None
+                self.mapped = None
+                os.close(self.fd)
+                self.fd = None
+            if self.write_error is not None:
+                print(f"Closed file '{self.fname}' after write error: {self.write_error}")
+            else:
+                # Calculate average frequency
+                time_range = self.t_end - self.t_start
+                f = self.count / time_range
+                print(f"Closed file '{self.fname}', {self.count} entries in {time_range:.2f}s, averaging {f:.0f}Hz")
             self.fname = ""
             self.t_start = -1
             self.t_end = -1
@@ -95,7 +358,8 @@ class SerialMonitor:
     Monitor initializer.
     Callbacks for:
         cb_msg(msg_string)          Message received
-        cb_data(data_bytes)         Data element received
+        cb_data(data_view)          One or more consecutive data elements received.
+                                    View of a reused buffer, only valid during the callback
         cb_data_start()             Data stream start received
         cb_data_end()               Data stream end received
         cb_disconnect(string)       Connection lost
@@ -111,53 +375,134 @@ class SerialMonitor:
         self.cb_disconnect = cb_disconnect
         self.cb_heartbeat = cb_heartbeat
         self.cb_error = cb_error
-        self.send_queue = queue.Queue()
+        self.send_queue = queue.SimpleQueue()
+        # Reused buffer for batches of data elements passed to cb_data, grown as needed
+        self.elem_buf = np.empty((elem_buf_count, data_util.data_length_bytes), dtype=np.uint8)
+        # Frame handler for every possible first byte, avoiding a comparison chain per frame
+        handlers = [self._frame_unknown] * 256
+        handlers[byte_message] = self._frame_message
+        handlers[byte_data_start] = self._frame_data_start
+        handlers[byte_data_element] = self._frame_data_elements
+        handlers[byte_data_end] = self._frame_data_end
+        handlers[byte_heartbeat] = self._frame_heartbeat
+        handlers[byte_error] = self._frame_error
+        self.frame_handlers = tuple(handlers)
+
+    # Frame handlers, indexed by a frame's first byte in self.frame_handlers.
+    # Each takes the receive buffer, a view of it, and the frame's start index, and returns
+    # the index after the frame, the same index if the frame is incomplete, or -1 to disconnect.
+    
+    # Null-terminated c-style string
+    def _frame_message(self, buf, mv, i):
+        end = buf.find(b'\x00', i + 1)
+        if end == -1:                               # Terminator not yet received
+            return i
+        # Discard null and decode to string, straight from the receive buffer.
+        # Invalid bytes are replaced rather than raising out of the communication thread
+        self.cb_msg(buf[i + 1:end].decode("utf-8", "replace"))
+        return end + 1
+    
+    # Start of data stream
+    def _frame_data_start(self, buf, mv, i):
+        self.cb_data_start()
+        return i + 1
+    
+    # Data stream elements, gathering run of fully received consecutive elements into one batch
+    def _frame_data_elements(self, buf, mv, i):
+        frame_len = 1 + data_util.data_length_bytes
+        n = len(buf)
+        j = i
+        while j + frame_len <= n and buf[j] == byte_data_element:
+            j += frame_len
+        count = (j - i) // frame_len
+        if count:
+            if count > len(self.elem_buf):
+                self.elem_buf = np.empty((count, data_util.data_length_bytes), dtype=np.uint8)
+            batch = self.elem_buf[:count]
+            # Copy element bytes, minus frame headers, into the reused buffer in one operation
+            np.copyto(batch, np.frombuffer(mv[i:j], dtype=np.uint8).reshape(count, frame_len)[:, 1:])
+            self.cb_data(memoryview(batch).cast("B"))
+        return j
+    
+    # End of data stream
+    def _frame_data_end(self, buf, mv, i):
+        self.cb_data_end()
+        return i + 1
+    
+    # Heartbeat
+    def _frame_heartbeat(self, buf, mv, i):
+        self.cb_heartbeat()
+        return i + 1
+    
+    # Device error
+    def _frame_error(self, buf, mv, i):
+        self.cb_error()
+        return -1
+    
+    def _frame_unknown(self, buf, mv, i):
+        print(f"Unexpected initial byte: {buf[i]}; disconnecting")
+        self.cb_disconnect("Unexpected data")
+        return -1
+    
+    """
+    Handle every complete frame at the start of buf, then remove the handled bytes.
+    Incomplete frames are left in buf until more bytes arrive.
+    Returns False if the connection should be closed.
+    """
+    def _handle_frames(self, buf):
+        handlers = self.frame_handlers
+        n = len(buf)
+        i = 0                                       # Start of next unhandled frame
+        keep_open = True
+        # View for slicing element bytes without intermediate copies; released before buf is resized
+        with memoryview(buf) as mv:
+            while i < n:
+                # First byte indicates what follows
+                j = handlers[buf[i]](buf, mv, i)
+                if j == i:                          # Frame not yet fully received
+                    break
+                if j < 0:
+                    keep_open = False
+                    break
+                i = j
+        # Compact once, keeping only the incomplete trailing frame
+        del buf[:i]
+        return keep_open
 
     # Communication thread function
     def _loop(self, port, baud):
         try:
-            with serial.Serial(port, baud, timeout=1) as s:
+            with serial.Serial(port, baud, timeout=serial_read_timeout) as s:
                 #s.flush()
                 print("Connection established")
                 self.connected = True
+                # Received bytes not yet handled
+                buf = bytearray()
+                # Local bindings for names used every pass. Callbacks are looked up by frame handlers
+                # at call time, so they may still be swapped while connected
+                read, write = s.read, s.write
+                handle_frames = self._handle_frames
+                send_get = self.send_queue.get_nowait
                 while self.do_run:
                     # READ
-                    # Handle any received data
-                    if s.in_waiting:
-                        # First byte indicates what follows
-                        b = s.read(1)
-                        if len(b) == 0:                 # Timeout occurred; ignore
-                            pass
-                        elif b[0] == byte_message:      # Null-terminated c-style string
-                            # Read string bytes
-                            msg = s.read_until(b'\x00')
-                            # Discard null and decode to string
-                            self.cb_msg(msg[:-1].decode("utf-8"))
-                        elif b[0] == byte_data_start:   # Start of data stream
-                            self.cb_data_start()
-                        elif b[0] == byte_data_element: # Data stream element
-                            # Read element bytes
-                            dat = s.read(data_util.data_length_bytes)
-                            self.cb_data(dat)
-                        elif b[0] == byte_data_end:
-                            # End of data stream
-                            self.cb_data_end()
-                        elif b[0] == byte_heartbeat:
-                            # Heartbeat
-                            self.cb_heartbeat()
-                        elif b[0] == byte_error:
-                            self.cb_error()
-                            break
-                        else:
-                            print(f"Unexpected initial byte: {b[0]}; disconnecting")
-                            self.cb_disconnect("Unexpected data")
+                    # Read everything waiting in one call, then handle complete frames.
+                    # Blocks for up to the read timeout when idle, rather than spinning
+                    chunk = read(max(1, s.in_waiting))
+                    if chunk:
+                        buf += chunk
+                        if not handle_frames(buf):
                             break
                     
                     # WRITE
-                    # Send any queued commands
-                    while not self.send_queue.empty():
-                        msg = self.send_queue.get()
-                        s.write(msg)
+                    # Send all queued commands in one write
+                    msgs = []
+                    try:
+                        while True:
+                            msgs.append(send_get())
+                    except queue.Empty:
+                        pass
+                    if msgs:
+                        write(b"".join(msgs))
         except serial.SerialException:
             self.cb_disconnect("SerialException")
         except serial.SerialTimeoutException:
@@ -194,7 +539,13 @@ class SerialMonitor:
     Message is placed in a queue, consumed by communication thread.
     """
     def send_msg(self, msg):
-        self.send_queue.put((f"{msg}\n").encode("utf-8"))
+        # Reuse encoded bytes for repeated commands, e.g. START/STOP
+        enc = command_cache.get(msg)
+        if enc is None:
+            enc = (f"{msg}\n").encode("utf-8")
+            if len(command_cache) < command_cache_max:
+                command_cache[msg] = enc
+        self.send_queue.put(enc)
     
     """
     Check current connection status.
@@ -211,7 +562,7 @@ class App:
     Begin app.
     """
     def __init__(self):
-        self.do_display_data = True
+        self.display_time_last = 0.0
         
         self.sm = SerialMonitor(self.on_serial_msg, self.on_serial_data, self.on_serial_data_start, self.on_serial_data_end, self.on_serial_disconnect, self.on_serial_heartbeat, self.on_serial_error)
         self.dscw = DataStreamDatWriter()
@@ -228,8 +579,8 @@ class App:
         # Connection
         self.port_sv = tk.StringVar(root)
         self.port_om = tk.OptionMenu(f, self.port_sv, "")
-        self.refresh_devices()
         self.port_om.grid(row=row, column=0, columnspan=3, sticky="ew")
+        self.refresh_devices()
         row += 1
         tk.Button(f, text="Connect", command=self.connect_to_device).grid(row=row, column=0, sticky="ew")
         tk.Button(f, text="Refresh", command=self.refresh_devices).grid(row=row, column=1, sticky="ew")
@@ -240,6 +591,8 @@ class App:
         self.heartbeat_sv = tk.StringVar(root)
         self.heartbeat_l = tk.Label(f, textvariable=self.heartbeat_sv)
         self.heartbeat_l.grid(row=row, column=2, sticky="ew")
+        self.heartbeat_color = None
+        self.heartbeat_text = None
         self.data_time_last = time.time()
         
         # Manual commands
@@ -283,7 +636,7 @@ class App:
         self.console_st.grid(row=0, column=3, rowspan=element_rows+2)
         self.console_st.bind("<Button-1>", lambda event:"break")
         self.console_st.bind("<B1-Motion>", lambda event:"break")
-        self.display_queue = queue.Queue()
+        self.display_queue = queue.SimpleQueue()
         
         # Sensor data graph
         self.fig = Figure()
@@ -318,6 +671,10 @@ class App:
         self.plot_data_max = 5000
         self.plot_data = np.empty((10, self.plot_data_max))
         self.plot_data_i = 0
+        # Fixed x axis, so blitted frames only need updated line data
+        self.plot_xs = np.arange(self.plot_data_max)
+        for i in range(4):
+            self.anim_axs[i].set_xlim(0, self.plot_data_max)
         self.anim = animation.FuncAnimation(self.fig, lambda i:self.graph_animate(i), len(self.plot_data), interval=50, blit=True)
         
         # --- Run UI ---
@@ -326,34 +683,51 @@ class App:
             root.mainloop()
         except KeyboardInterrupt:
             self.sm.disconnect()
+            self.dscw.end()
     
     # Self-invoking function to update UI
     def refresh_ui(self):
-        # Update console
-        if not self.display_queue.empty():
+        # Update console, inserting pending messages at once; bounded so a backlog can't stall the UI
+        msgs = []
+        try:
+            for _ in range(console_drain_max):
+                msgs.append(self.display_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if msgs:
             self.console_st.configure(state="normal")
-            while not self.display_queue.empty():
-                msg = self.display_queue.get()
-                self.console_st.insert(tk.INSERT, f"{msg}")
+            self.console_st.insert(tk.INSERT, "".join(msgs))
+            # Drop oldest lines beyond limit, as Tk text widgets slow down as they grow
+            excess_lines = int(self.console_st.index("end-1c").split(".")[0]) - console_max_lines
+            if excess_lines > 0:
+                self.console_st.delete("1.0", f"{excess_lines + 1}.0")
             self.console_st.configure(state="disabled")
             self.console_st.yview(tk.END)
         # Update heartbeat monitor
         if self.sm.is_connected():
             time_since_data = time.time() - self.data_time_last
             if time_since_data > connection_status_warning_time:
-                self.heartbeat_l.config(fg='red')
+                heartbeat_color = 'red'
             else:
-                self.heartbeat_l.config(fg='green')
-            self.heartbeat_sv.set(f"{time_since_data:.2f}")
+                heartbeat_color = 'green'
+            heartbeat_text = f"{time_since_data:.2f}"
         else:
-            self.heartbeat_sv.set("n/a")
-            self.heartbeat_l.config(fg='red')
+            heartbeat_text = "n/a"
+            heartbeat_color = 'red'
+        # Only update widgets on change, as each update costs Tk redraw work
+        if heartbeat_color != self.heartbeat_color:
+            self.heartbeat_color = heartbeat_color
+            self.heartbeat_l.config(fg=heartbeat_color)
+        if heartbeat_text != self.heartbeat_text:
+            self.heartbeat_text = heartbeat_text
+            self.heartbeat_sv.set(heartbeat_text)
         # Refresh again after delay
         self.root.after(50, self.refresh_ui)
     
     # Invoked when UI closed
     def on_exit(self):
         self.sm.disconnect()
+        self.dscw.end()
         self.root.destroy()
     
     # Callback for Refresh
@@ -364,10 +738,12 @@ class App:
         if len(valid_ports) == 0:
             valid_ports.append("No devices detected")
         self.port_sv.set(valid_ports[0])
-        # Remove previous options, add new options
-        self.port_om["menu"].delete(0, tk.END)
-        for p in valid_ports:
-            self.port_om["menu"].add_command(label=p, command=tk._setit(self.port_sv, p))
+        # Replace menu with one holding the new options, in the same grid position.
+        # One widget rebuild, rather than a menu layout for every port added
+        grid = self.port_om.grid_info()
+        self.port_om.destroy()
+        self.port_om = tk.OptionMenu(grid["in"], self.port_sv, *valid_ports)
+        self.port_om.grid(**grid)
     
     # Callback for Connect
     def connect_to_device(self):
@@ -407,7 +783,8 @@ class App:
     def send_command_read(self):
         file = self.file_e.get()
         self.dscw.set_file_suffix(f"-{pathlib.Path(file).stem}") # remove file extension
-        self.do_display_data = False
+        # Swap data callback rather than checking a flag per data element
+        self.sm.cb_data = self.on_serial_data_quiet
         self.send_command(f"READ {file}")
     
     # Send DEL file command
@@ -427,21 +804,32 @@ class App:
         self.any_data()
         self.plot_data_i = 0
     
-    # Callback for data element - write to DataStreamDatWriter, and to console if not suppressed
+    # Callback for data elements - write to DataStreamDatWriter, and to graph and console
     def on_serial_data(self, data):
-        if self.do_display_data:
-            # Print to console
-            vals = data_util.bytes_to_values(data)
-            vals_pretty = data_util.values_to_str(vals)
+        # Convert whole batch at once, one row per element
+        vals = data_util.bulk_to_values(data_util.bytes_to_values_bulk(data))
+        n = len(vals)
+        # Display on graph, keeping the newest third when full (less if batch needs the room)
+        if self.plot_data_i + n > self.plot_data_max:
+            vals = vals[-self.plot_data_max:]
+            n = len(vals)
+            keep = min(self.plot_data_i, self.plot_data_max // 3, self.plot_data_max - n)
+            self.plot_data[:,:keep] = self.plot_data[:,self.plot_data_i - keep:self.plot_data_i]
+            self.plot_data_i = keep
+        self.plot_data[:,self.plot_data_i:self.plot_data_i + n] = vals.T
+        self.plot_data_i += n
+        # Print latest to console, at most once per display interval, and not while UI is behind
+        now = time.monotonic()
+        if now - self.display_time_last >= console_display_interval and self.display_queue.qsize() < console_queue_max:
+            self.display_time_last = now
+            vals_pretty = data_util.values_to_str(vals[-1])
             self.display_queue.put(f"{vals_pretty}\n")
-            # Display on graph
-            if self.plot_data_i >= self.plot_data_max:
-                self.plot_data_i = self.plot_data_max // 3
-                self.plot_data[:,:self.plot_data_i] = self.plot_data[:,-self.plot_data_i:]
-            self.plot_data[:,self.plot_data_i] = vals
-            self.plot_data_i += 1
+        self.on_serial_data_quiet(data)
+    
+    # Callback for data elements when display is suppressed - write to DataStreamDatWriter only
+    def on_serial_data_quiet(self, data):
         # Save to file
-        self.dscw.write(data)
+        self.dscw.write_many(data)
         # Update connection monitor
         self.any_data()
     
@@ -449,7 +837,7 @@ class App:
     def on_serial_data_end(self):
         self.display_queue.put("=== DATA END ===\n")
         self.dscw.end()
-        self.do_display_data = True
+        self.sm.cb_data = self.on_serial_data
         self.any_data()
     
     # Callback for disconnection, display reason
@@ -473,7 +861,7 @@ class App:
     def graph_animate(self, i):
         # Draw new lines
         pd = self.plot_data[:,:self.plot_data_i]
-        ts = range(self.plot_data_i)
+        ts = self.plot_xs[:self.plot_data_i]
         self.anim_analog.set_data(ts, pd[1,:])
         self.anim_btn_0.set_data(ts, pd[2,:])
         self.anim_btn_1.set_data(ts, pd[3,:])
@@ -483,8 +871,6 @@ class App:
         self.anim_gyro_x.set_data(ts, pd[7,:])
         self.anim_gyro_y.set_data(ts, pd[8,:])
         self.anim_gyro_z.set_data(ts, pd[9,:])
-        for i in range(4):
-            self.anim_axs[i].set_xlim(0, self.plot_data_max)
         return self.anim_analog, self.anim_btn_0, self.anim_btn_1, self.anim_acc_x, self.anim_acc_y, self.anim_acc_z, self.anim_gyro_x, self.anim_gyro_y, self.anim_gyro_z
 
 